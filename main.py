@@ -1,30 +1,60 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import platform
+import queue
 import re
+import shutil
+import string
 import subprocess
+import threading
+import traceback
+from collections import Counter, deque
+from itertools import islice
+from operator import itemgetter
 from dataclasses import dataclass, asdict
+from functools import partial
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
-from openpyxl import Workbook  # type: ignore
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # optional: falls back to a plain substring scan
+    ahocorasick = None
+
+try:
+    import ijson  # type: ignore
+except ImportError:  # optional: falls back to json.load
+    ijson = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional: falls back to the json module
+    orjson = None
 
 APP_TITLE = "RAM Barcode Scanner"
 MAPPINGS_JSON = Path(__file__).with_name("user_mappings.json")
+# scan history: append-only, one JSON object per line
+RESULTS_JSONL = Path(__file__).with_name("scan_results.jsonl")
+# older single-array format, only read to migrate existing histories
 RESULTS_JSON = Path(__file__).with_name("scan_results.json")
 
 SUCCESS_WAV = Path(__file__).with_name("success.wav")
 UNKNOWN_WAV = Path(__file__).with_name("unknown.wav")
 
-# only last N results shown in UI (all still saved in JSON)
+# only last N results shown in UI (all still saved in JSONL)
 MAX_VISIBLE_RESULTS = 10
 
+# saves are batched: at most one write per file every SAVE_DELAY_MS
+SAVE_DELAY_MS = 500
+
 COLOR_SIZE = "#1f77b4"
 COLOR_SPEED = "#2ca02c"
 COLOR_TYPE = "#d62728"
@@ -35,6 +65,81 @@ COLOR_VERSION = "#8c564b"
 COLOR_BARCODE = "#555555"
 
 
+# -------------------- Background disk writes --------------------
+# (path, data, append) jobs, written in order by a single worker thread
+# so saving never blocks the Tk main loop
+_save_queue: "queue.Queue[Tuple[Path, bytes, bool]]" = queue.Queue()
+_save_worker: Optional[threading.Thread] = None
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Write via a temp file in the same directory + os.replace, so a crash never leaves a truncated file."""
+    # created 0o666 like a plain open(), so the umask applies as usual
+    # (tempfile creates its files 0600)
+    while True:
+        tmp_name = str(path.parent / f"{path.name}.{os.urandom(4).hex()}.tmp")
+        try:
+            fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        # an existing file keeps its mode
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        # never leave a stray .tmp behind (disk full, EIO, ...)
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _save_worker_loop():
+    while True:
+        path, data, append = _save_queue.get()
+        try:
+            if append:
+                with path.open("ab") as f:
+                    f.write(data)
+            else:
+                _atomic_write_bytes(path, data)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            _save_queue.task_done()
+
+
+def queue_write(path: Path, data: bytes, append: bool = False):
+    global _save_worker
+    if _save_worker is None:
+        _save_worker = threading.Thread(target=_save_worker_loop, name="save-writer", daemon=True)
+        _save_worker.start()
+    _save_queue.put((path, data, append))
+
+
+def flush_writes():
+    """Block until every queued write is on disk."""
+    _save_queue.join()
+
+
+def json_line(obj) -> bytes:
+    """Encode obj as one JSONL record."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+# both accept bytes and raise ValueError subclasses on bad input
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
 # -------------------- Data models --------------------
 @dataclass
 class Mapping:
@@ -47,13 +152,19 @@ class Mapping:
     ecc: Optional[bool] = None
     regex: bool = False
 
-    def matches(self, code: str) -> bool:
+    def __post_init__(self):
+        # compiled once; not a dataclass field, so asdict() ignores it.
+        # Stays None for a pattern that doesn't compile (it never matches).
+        self._compiled: Optional[re.Pattern] = None
         if self.regex:
             try:
-                return re.search(self.pattern, code) is not None
+                self._compiled = re.compile(self.pattern)
             except re.error:
-                return False
-        return self.pattern == code
+                pass
+        # (mem_type, speed, ecc) implied by module_class, used to fill gaps on a hit
+        self._mc: Tuple[Optional[str], Optional[int], Optional[bool]] = (
+            parse_module_class(self.module_class) if self.module_class else (None, None, None)
+        )
 
 
 @dataclass
@@ -70,6 +181,22 @@ class ScanResult:
     version: int           # permanently bound to that barcode
 
 
+# ECC flag -> display text
+YES_NO = {True: "Yes", False: "No", None: "?"}
+# same, for the latest panel's placeholder style
+YES_NO_DASH = {True: "Yes", False: "No", None: "–"}
+
+# version -> "v<N>", built once per version instead of on every refresh
+_VERSION_TEXT: Dict[int, str] = {}
+
+
+def version_text(version: int) -> str:
+    text = _VERSION_TEXT.get(version)
+    if text is None:
+        text = _VERSION_TEXT[version] = f"v{version}"
+    return text
+
+
 # -------------------- Mapping store --------------------
 class MappingStore:
     """
@@ -102,9 +229,18 @@ class MappingStore:
         self.path = path
         self.mappings: List[Mapping] = []
         self.versions: Dict[str, int] = {}
+        # lookup indexes derived from self.mappings (see _reindex)
+        self._exact: Dict[str, Mapping] = {}
+        self._regex_mappings: List[Mapping] = []
+        # barcode -> parse_barcode() result, valid until the mappings change
+        self._parse_cache: Dict[str, Tuple] = {}
         self.load()
 
     def load(self):
+        self._load_raw()
+        self._reindex()
+
+    def _load_raw(self):
         if not self.path.exists():
             self.mappings = []
             self.versions = {}
@@ -117,26 +253,15 @@ class MappingStore:
             self.versions = {}
             return
 
+        # missing module_class / ecc / regex keys fall back to the Mapping defaults
         if isinstance(raw, list):
             # legacy format: just a list of mappings
-            self.mappings = []
-            for m in raw:
-                m = dict(m)
-                m.setdefault("module_class", None)
-                m.setdefault("ecc", None)
-                m.setdefault("regex", False)
-                self.mappings.append(Mapping(**m))
+            self.mappings = [Mapping(**m) for m in raw]
             self.versions = {}
         elif isinstance(raw, dict):
             data = raw
             mappings_src = data.get("mappings", [])
-            self.mappings = []
-            for m in mappings_src:
-                m = dict(m)
-                m.setdefault("module_class", None)
-                m.setdefault("ecc", None)
-                m.setdefault("regex", False)
-                self.mappings.append(Mapping(**m))
+            self.mappings = [Mapping(**m) for m in mappings_src]
             versions_src = data.get("versions", {})
             self.versions = {str(k): int(v) for k, v in versions_src.items()}
         else:
@@ -148,45 +273,61 @@ class MappingStore:
             "mappings": [asdict(m) for m in self.mappings],
             "versions": self.versions,
         }
-        self.path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        queue_write(self.path, json.dumps(data, indent=2).encode("utf-8"))
+
+    def _reindex(self):
+        """
+        Rebuild the lookup indexes used by find():
+        exact patterns go into a dict keyed by the stripped pattern, the
+        same normalization parse_barcode applies to scanned codes
+        (first mapping wins),
+        regex patterns (compiled by Mapping itself) are kept in file order.
+        Also drops cached parse results, since they depend on the mappings.
+        """
+        self._exact = {}
+        self._regex_mappings = []
+        self._parse_cache = {}
+        for m in self.mappings:
+            if m.regex:
+                # broken patterns can never match, so don't try them per scan
+                if m._compiled is not None:
+                    self._regex_mappings.append(m)
+            else:
+                self._exact.setdefault(m.pattern.strip(), m)
 
     def add(self, m: Mapping):
         self.mappings.append(m)
+        self._reindex()
         self.save()
 
     def remove_index(self, idx: int):
         try:
             del self.mappings[idx]
+            self._reindex()
             self.save()
         except Exception:
             pass
 
     def find(self, code: str) -> Optional[Mapping]:
         # exact first
-        for m in self.mappings:
-            if not m.regex and m.matches(code):
-                return m
+        m = self._exact.get(code)
+        if m is not None:
+            return m
         # regex after
-        for m in self.mappings:
-            if m.regex and m.matches(code):
-                return m
-        return None
+        return next((m for m in self._regex_mappings if m._compiled.search(code)), None)
 
-    def all_descriptions(self) -> List[str]:
-        out: List[str] = []
+    def all_descriptions(self) -> Iterator[str]:
         for m in self.mappings:
             pat = f"/{m.pattern}/" if m.regex else m.pattern
-            parts = [
-                f"Pattern: {pat}",
-                f"Size: {m.size_gb or '?'} GB",
-                f"Speed: {m.speed_mts or '?'} MT/s",
-                f"Type: {m.mem_type or '?'}",
-                f"Class: {m.module_class or '?'}",
-                f"ECC: {'Yes' if m.ecc else ('No' if m.ecc is not None else '?')}",
-                f"Mfr: {m.manufacturer or '?'}",
-            ]
-            out.append(" | ".join(parts))
-        return out
+            yield (
+                f"Pattern: {pat} | "
+                f"Size: {m.size_gb or '?'} GB | "
+                f"Speed: {m.speed_mts or '?'} MT/s | "
+                f"Type: {m.mem_type or '?'} | "
+                f"Class: {m.module_class or '?'} | "
+                f"ECC: {YES_NO[None if m.ecc is None else bool(m.ecc)]} | "
+                f"Mfr: {m.manufacturer or '?'}"
+            )
 
 
 # -------------------- Heuristic parsing --------------------
@@ -208,6 +349,31 @@ MANUFACTURER_HINTS = {
     "nanya": "Nanya",
 }
 
+
+def _build_hint_trie(hints: Dict[str, str]) -> Dict:
+    """Char-by-char trie over the hint keys; the None key marks a complete hint."""
+    trie: Dict = {}
+    for prio, (key, name) in enumerate(hints.items()):
+        node = trie
+        for ch in key.lower():
+            node = node.setdefault(ch, {})
+        node.setdefault(None, (prio, name))
+    return trie
+
+
+# Single-pass hint matchers (Aho-Corasick if available, else a trie).
+# Hits carry the hint's position in MANUFACTURER_HINTS so the earliest
+# listed hint still wins.
+if ahocorasick is not None:
+    _MFR_AC = ahocorasick.Automaton()
+    for _prio, (_key, _name) in enumerate(MANUFACTURER_HINTS.items()):
+        _MFR_AC.add_word(_key.lower(), (_prio, _name))
+    _MFR_AC.make_automaton()
+    _HINT_TRIE = None
+else:
+    _MFR_AC = None
+    _HINT_TRIE = _build_hint_trie(MANUFACTURER_HINTS)
+
 TYPE_PATTERNS = {
     r"ddr\s*5": "DDR5",
     r"ddr\s*4": "DDR4",
@@ -230,6 +396,22 @@ SPEED_PATTERNS = [
     r"\b(\d{3,5})\s*mhz\b",
 ]
 
+
+def _first_match_re(patterns) -> re.Pattern:
+    """
+    Fuse patterns into one regex that behaves like looping re.search over
+    them: the first pattern (in list order) found anywhere in the text wins.
+    Each alternative is a lookahead tried from the start of the string;
+    group p<i> tells which pattern matched.
+    """
+    return re.compile("|".join(f"(?=.*?(?P<p{i}>{p}))" for i, p in enumerate(patterns)), re.DOTALL)
+
+
+_SIZE_RE = _first_match_re(SIZE_PATTERNS)
+_SPEED_RE = _first_match_re(SPEED_PATTERNS)
+_TYPE_RE = _first_match_re(TYPE_PATTERNS)
+_TYPE_VALUES = tuple(TYPE_PATTERNS.values())
+
 # PCn-XXXXX(L/E/R/U/...) pattern
 MODULE_CLASS_RE = re.compile(
     r"pc(?P<gen>\d+)(?P<lv>l)?[- ]?(?P<rating>\d{3,6})(?P<suffix>[a-zA-Z]*)",
@@ -260,12 +442,25 @@ COMMON_MB_TO_MTS = {
     32000: 4000,
 }
 
+# PCx generation digit -> DDR type
+_GEN_TO_MEM = {"2": "DDR2", "3": "DDR3", "4": "DDR4", "5": "DDR5"}
+
 # Inverse: MT/s -> canonical PC rating (MB/s)
 SPEED_TO_MB: Dict[int, int] = {}
 for mb, mts in COMMON_MB_TO_MTS.items():
     SPEED_TO_MB.setdefault(mts, mb)
 
 
+class _KeepAlnum(dict):
+    """str.translate table that keeps A-Z / 0-9 and deletes everything else."""
+
+    def __missing__(self, key):
+        return None
+
+
+_ALNUM_ONLY = _KeepAlnum((ord(c), c) for c in string.ascii_uppercase + string.digits)
+
+
 def synth_module_class(
     mem_type: Optional[str],
     speed_mts: Optional[int],
@@ -278,8 +473,7 @@ def synth_module_class(
     if not mem_type or not speed_mts:
         return None
 
-    m = mem_type.upper().replace(" ", "")
-    m = re.sub(r"[^A-Z0-9]", "", m)
+    m = mem_type.upper().translate(_ALNUM_ONLY)
     if not m.startswith("DDR") or len(m) < 4 or not m[3].isdigit():
         return None
 
@@ -294,10 +488,7 @@ def synth_module_class(
     return f"{pc_prefix}-{mb}"
 
 
-def extract_module_class(text: str) -> Optional[str]:
-    m = MODULE_CLASS_RE.search(text)
-    if not m:
-        return None
+def _format_module_class(m: re.Match) -> str:
     gen = m.group("gen")
     lv = m.group("lv") or ""
     rating = m.group("rating")
@@ -311,22 +502,22 @@ def parse_module_class(module_class: str) -> Tuple[Optional[str], Optional[int],
     m = MODULE_CLASS_RE.search(s)
     if not m:
         return None, None, None
+    return _module_class_fields(m)
 
+
+def _module_class_fields(m: re.Match) -> Tuple[Optional[str], Optional[int], Optional[bool]]:
     gen = m.group("gen")
     rating = m.group("rating")
     suffix = (m.group("suffix") or "").upper()
 
-    mem_type = {"2": "DDR2", "3": "DDR3", "4": "DDR4", "5": "DDR5"}.get(gen)
+    mem_type = _GEN_TO_MEM.get(gen)
 
     speed: Optional[int] = None
     try:
         rating_int = int(rating)
-        if rating_int in COMMON_MB_TO_MTS:
-            speed = COMMON_MB_TO_MTS[rating_int]
-        elif rating_int < 4000:
-            speed = rating_int
-        else:
-            speed = max(1, round(rating_int / 8.0))
+        speed = COMMON_MB_TO_MTS.get(rating_int)
+        if speed is None:
+            speed = rating_int if rating_int < 4000 else max(1, round(rating_int / 8.0))
     except Exception:
         speed = None
 
@@ -337,6 +528,24 @@ def parse_module_class(module_class: str) -> Tuple[Optional[str], Optional[int],
     return mem_type, speed, ecc
 
 
+def match_manufacturer(lower: str) -> Optional[str]:
+    if _MFR_AC is not None:
+        best = min((hit for _, hit in _MFR_AC.iter(lower)), default=None)
+        return best[1] if best else None
+    best = None
+    n = len(lower)
+    for i in range(n):
+        node = _HINT_TRIE
+        for j in range(i, n):
+            node = node.get(lower[j])
+            if node is None:
+                break
+            hit = node.get(None)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+    return best[1] if best else None
+
+
 def parse_barcode(
     code: str,
     store: MappingStore,
@@ -344,64 +553,77 @@ def parse_barcode(
     """
     Return:
       size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok
+
+    Results are memoized per barcode on the store (reloading history
+    re-parses the same barcodes many times).
     """
     code_clean = code.strip()
+    cached = store._parse_cache.get(code_clean)
+    if cached is None:
+        cached = store._parse_cache[code_clean] = _parse_barcode_uncached(code_clean, store)
+    return cached
+
+
+def parse_mapping(
+    m: Mapping,
+) -> Tuple[Optional[int], Optional[int], Optional[str], Optional[str], Optional[str], Optional[bool], bool]:
+    """
+    What parse_barcode returns for a barcode matched by mapping m:
+    its fields, with type/speed/ecc gaps filled from its module class.
+    """
+    size_gb = m.size_gb
+    speed_mts = m.speed_mts
+    mem_type = m.mem_type
+    manufacturer = m.manufacturer
+    module_class = m.module_class
+    ecc = m.ecc
+    if module_class:
+        mc_type, mc_speed, mc_ecc = m._mc
+        if mc_type and not mem_type:
+            mem_type = mc_type
+        if mc_speed and not speed_mts:
+            speed_mts = mc_speed
+        if mc_ecc is not None and ecc is None:
+            ecc = mc_ecc
+    parsed_ok = bool(size_gb and speed_mts and mem_type and manufacturer)
+    return size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok
+
+
+def _parse_barcode_uncached(
+    code_clean: str,
+    store: MappingStore,
+) -> Tuple[Optional[int], Optional[int], Optional[str], Optional[str], Optional[str], Optional[bool], bool]:
     m = store.find(code_clean)
+    if m:
+        return parse_mapping(m)
+
     size_gb: Optional[int] = None
     speed_mts: Optional[int] = None
     mem_type: Optional[str] = None
-    manufacturer: Optional[str] = None
     module_class: Optional[str] = None
     ecc: Optional[bool] = None
 
-    if m:
-        size_gb = m.size_gb
-        speed_mts = m.speed_mts
-        mem_type = m.mem_type
-        manufacturer = m.manufacturer
-        module_class = m.module_class
-        ecc = m.ecc
-        if module_class:
-            mc_type, mc_speed, mc_ecc = parse_module_class(module_class)
-            if mc_type and not mem_type:
-                mem_type = mc_type
-            if mc_speed and not speed_mts:
-                speed_mts = mc_speed
-            if mc_ecc is not None and ecc is None:
-                ecc = mc_ecc
-        parsed_ok = all([size_gb, speed_mts, mem_type, manufacturer])
-        return size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok
-
     lower = code_clean.lower()
 
-    for pat in SIZE_PATTERNS:
-        mm = re.search(pat, lower)
-        if mm:
-            try:
-                size_gb = int(mm.group(1))
-                break
-            except Exception:
-                pass
-
-    for pat, tval in TYPE_PATTERNS.items():
-        if re.search(pat, lower):
-            mem_type = tval
-            break
-
-    for pat in SPEED_PATTERNS:
-        mm = re.search(pat, lower)
-        if not mm:
-            continue
-        try:
-            val = int(mm.group(1))
-            speed_mts = val
-            break
-        except Exception:
-            continue
-
-    module_class = extract_module_class(lower)
-    if module_class:
-        mc_type, mc_speed, mc_ecc = parse_module_class(module_class)
+    # size/speed patterns capture their number in the group right after p<i>
+    mm = _SIZE_RE.match(lower)
+    if mm:
+        size_gb = int(mm.group(mm.lastindex + 1))
+
+    mm = _TYPE_RE.match(lower)
+    if mm:
+        mem_type = _TYPE_VALUES[int(mm.lastgroup[1:])]
+
+    mm = _SPEED_RE.match(lower)
+    if mm:
+        speed_mts = int(mm.group(mm.lastindex + 1))
+
+    # read the class fields off the same match instead of re-parsing
+    # the formatted class string
+    mm = MODULE_CLASS_RE.search(lower)
+    if mm:
+        module_class = _format_module_class(mm)
+        mc_type, mc_speed, mc_ecc = _module_class_fields(mm)
         if mc_type and not mem_type:
             mem_type = mc_type
         if mc_speed and not speed_mts:
@@ -409,21 +631,49 @@ def parse_barcode(
         if mc_ecc is not None:
             ecc = mc_ecc
 
-    for key, name in MANUFACTURER_HINTS.items():
-        if key in lower:
-            manufacturer = name
-            break
+    manufacturer = match_manufacturer(lower)
 
-    parsed_ok = all([size_gb, speed_mts, mem_type, manufacturer])
+    parsed_ok = bool(size_gb and speed_mts and mem_type and manufacturer)
     return size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok
 
 
 # -------------------- Sound helpers --------------------
+# platform.system() does a uname() on POSIX; it can't change at runtime
+_SYSTEM = platform.system()
+
+# Linux/other: first available command-line player and alert sound,
+# probed once instead of trial-spawning on every beep
+_LINUX_PLAYER = next((c for c in ("paplay", "aplay", "ffplay") if shutil.which(c)), None)
+_LINUX_ALERT_SOUND = next(
+    (
+        snd
+        for snd in (
+            "/usr/share/sounds/freedesktop/stereo/dialog-error.oga",
+            "/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga",
+            "/usr/share/sounds/freedesktop/stereo/complete.oga",
+        )
+        if Path(snd).exists()
+    ),
+    None,
+)
+
+
+def _play_with_linux_player(path: str) -> bool:
+    if _LINUX_PLAYER is None:
+        return False
+    subprocess.Popen(
+        [_LINUX_PLAYER, path],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return True
+
+
 def play_wav_if_available(path: Path) -> bool:
     if not path.exists():
         return False
     try:
-        system = platform.system()
+        system = _SYSTEM
         if system == "Windows":
             import winsound  # type: ignore
 
@@ -433,16 +683,7 @@ def play_wav_if_available(path: Path) -> bool:
             subprocess.Popen(["afplay", str(path)])
             return True
         else:
-            for cmd in ("paplay", "aplay", "ffplay"):
-                try:
-                    subprocess.Popen(
-                        [cmd, str(path)],
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                    )
-                    return True
-                except FileNotFoundError:
-                    continue
+            return _play_with_linux_player(str(path))
     except Exception:
         pass
     return False
@@ -456,7 +697,7 @@ def play_success():
 def play_unknown():
     if play_wav_if_available(UNKNOWN_WAV):
         return
-    system = platform.system()
+    system = _SYSTEM
     try:
         if system == "Windows":
             import winsound  # type: ignore
@@ -480,23 +721,8 @@ def play_unknown():
             root.after(240, root.bell)
             return
         else:
-            candidates = [
-                "/usr/share/sounds/freedesktop/stereo/dialog-error.oga",
-                "/usr/share/sounds/freedesktop/stereo/alarm-clock-elapsed.oga",
-                "/usr/share/sounds/freedesktop/stereo/complete.oga",
-            ]
-            for cmd in ("paplay", "aplay", "ffplay"):
-                for snd in candidates:
-                    if Path(snd).exists():
-                        try:
-                            subprocess.Popen(
-                                [cmd, snd],
-                                stdout=subprocess.DEVNULL,
-                                stderr=subprocess.DEVNULL,
-                            )
-                            return
-                        except Exception:
-                            continue
+            if _LINUX_ALERT_SOUND and _play_with_linux_player(_LINUX_ALERT_SOUND):
+                return
             root.bell()
             root.after(120, root.bell)
             root.after(240, root.bell)
@@ -509,6 +735,11 @@ def play_unknown():
 
 
 # -------------------- GUI App --------------------
+COUNTS_COLUMNS = ("variant", "size", "speed", "class", "ecc", "manufacturer", "version", "count")
+# columns sorted numerically (missing values first); the rest case-insensitively
+_NUMERIC_COUNTS_COLUMNS = frozenset(("size", "speed", "version", "count"))
+
+
 class App(ttk.Frame):
     def __init__(self, master: tk.Tk, store: MappingStore):
         super().__init__(master)
@@ -516,23 +747,38 @@ class App(ttk.Frame):
         self.store = store
         self.pack(fill=tk.BOTH, expand=True)
 
-        # permanent barcode -> version mapping (from user_mappings.json)
-        self.barcode_versions: Dict[str, int] = dict(self.store.versions)
+        # permanent barcode -> version mapping; the store's own dict (not a
+        # copy), so saving the store always writes the current versions
+        self.barcode_versions: Dict[str, int] = self.store.versions
+        # highest version handed out so far; versions are never reused
+        self._max_version: int = max(self.barcode_versions.values(), default=0)
 
-        # meta: (size, speed, mem_type, module_class, ecc, manufacturer)
-        self.variant_meta: Dict[
-            str, Tuple[Optional[int], Optional[int], Optional[str], Optional[str], Optional[bool], Optional[str]]
-        ] = {}
-        self.variant_counts: Dict[str, int] = {}
+        # meta: barcode -> its newest result (size, speed, type, class, ecc, manufacturer)
+        self.variant_meta: Dict[str, ScanResult] = {}
+        self.variant_counts: Counter[str] = Counter()
 
-        self.results_data: List[ScanResult] = []
+        # id -> result, in scan order (ids only grow), so removal is O(1)
+        self.results_data: Dict[int, ScanResult] = {}
         self.result_seq: int = 0
 
         self.latest_item_id: Optional[int] = None
         self.latest_key: Optional[str] = None
+        # label texts last shown in the latest panel
+        self._latest_cache: Tuple[str, ...] = ()
 
         self.counts_sort_column: str = "version"
         self.counts_sort_reverse: bool = False
+        # barcode -> values currently shown in its counts_tree row
+        self._counts_shown: Dict[str, Tuple] = {}
+
+        # pending (debounced) saves, written by _flush_saves
+        self._store_dirty = False
+        self._results_dirty = False  # whole history needs a rewrite
+        self._pending_results: List[ScanResult] = []  # new scans to append
+        self._flush_after_id: Optional[str] = None
+        # exit path (Ctrl-C, an exception out of mainloop, ...); closing
+        # the window goes through _on_close
+        atexit.register(self._flush_saves_and_wait)
 
         self._build_ui()
         self._load_results_from_file_and_rebuild()
@@ -543,6 +789,7 @@ class App(ttk.Frame):
         self.master.geometry("1300x800")
         self.master.minsize(1100, 680)
         self.master.resizable(True, True)
+        self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
         paned = ttk.Panedwindow(self, orient=tk.HORIZONTAL)
         paned.pack(fill=tk.BOTH, expand=True)
@@ -649,6 +896,21 @@ class App(ttk.Frame):
         map_box.columnconfigure(1, weight=1)
         map_box.columnconfigure(2, weight=1)
 
+        # textvariable name -> its entry, for focus_mapping_field
+        self._entry_by_var: Dict[str, tk.Widget] = {
+            str(var): widget
+            for var, widget in (
+                (self.map_code_var, self.map_code_entry),
+                (self.map_size_var, self.map_size_entry),
+                (self.map_class_var, self.map_class_entry),
+                (self.map_mfr_var, self.map_mfr_entry),
+                (self.map_ecc_var, self.map_ecc_combo),
+                (self.map_ddr_var, self.map_ddr_combo),
+                (self.map_kind_var, self.map_kind_combo),
+                (self.map_speed_var, self.map_speed_entry),
+            )
+        }
+
         # Enter-to-advance across mapping fields
         self.map_code_entry.bind("<Return>", lambda e: self._enter_advance(self.map_code_var, self.map_size_entry))
         self.map_size_entry.bind("<Return>", lambda e: self._enter_advance(self.map_size_var, self.map_class_entry))
@@ -707,8 +969,8 @@ class App(ttk.Frame):
         self.latest_remove_btn.grid(row=0, column=6, sticky="e")
 
         # Right-click copy on latest panel
-        self._attach_copy(self.latest_ver_lbl, lambda: self.latest_ver_lbl.cget("text"))
         for w in (
+            self.latest_ver_lbl,
             self.latest_size_val,
             self.latest_speed_val,
             self.latest_type_val,
@@ -717,7 +979,7 @@ class App(ttk.Frame):
             self.latest_mfr_val,
             self.latest_code_val,
         ):
-            self._attach_copy(w, lambda w=w: w.cget("text"))
+            self._attach_copy(w)
 
         # ----- Middle: Results cards -----
         results_box = ttk.LabelFrame(middle, text="Scan Results")
@@ -735,7 +997,7 @@ class App(ttk.Frame):
             "<Configure>", lambda e: self.results_canvas.configure(scrollregion=self.results_canvas.bbox("all"))
         )
 
-        self.results_items: List[Dict] = []
+        self.results_items: Deque[Dict] = deque()
 
         action_row = ttk.Frame(middle)
         action_row.pack(fill=tk.X, pady=(8, 0))
@@ -747,7 +1009,7 @@ class App(ttk.Frame):
 
         self.counts_tree = ttk.Treeview(
             counts_box,
-            columns=("variant", "size", "speed", "class", "ecc", "manufacturer", "version", "count"),
+            columns=COUNTS_COLUMNS,
             show="headings",
             selectmode="browse",
         )
@@ -779,132 +1041,244 @@ class App(ttk.Frame):
         self.counts_tree.bind("<Button-2>", self.on_counts_right_click)
 
     # --------- Results persistence ----------
-    def _save_results_file(self):
+    @staticmethod
+    def _results_entry(r: ScanResult) -> Dict:
         """
         Persist scan history with minimal info:
         each entry only stores id, timestamp, barcode, version.
         Specs are reconstructed from mappings/heuristics on load.
         """
-        data = [
-            {
-                "id": r.id,
-                "timestamp": r.timestamp,
-                "barcode": r.barcode,
-                "version": r.version,
-            }
-            for r in self.results_data
-        ]
-        RESULTS_JSON.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        return {
+            "id": r.id,
+            "timestamp": r.timestamp,
+            "barcode": r.barcode,
+            "version": r.version,
+        }
 
-    def _load_results_file(self) -> List[ScanResult]:
+    def _append_result_lines(self, results: List[ScanResult]):
+        """Record new scans: appended lines instead of a rewrite."""
+        queue_write(RESULTS_JSONL, b"".join(json_line(self._results_entry(r)) for r in results), append=True)
+
+    @staticmethod
+    def _results_log_ends_with_newline() -> bool:
+        try:
+            with RESULTS_JSONL.open("rb") as f:
+                f.seek(0, os.SEEK_END)
+                if not f.tell():
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b"\n"
+        except OSError:
+            # unreadable (or not a file): loading skipped it too, nothing to repair
+            return True
+
+    def _save_results_file(self):
+        """Rewrite the whole history (after removals / clearing)."""
+        queue_write(RESULTS_JSONL, b"".join(json_line(self._results_entry(r)) for r in self.results_data.values()))
+
+    def _schedule_save(
+        self, store: bool = False, rewrite_results: bool = False, new_result: Optional[ScanResult] = None
+    ):
         """
-        Load scan history from scan_results.json which now only has
-        id, timestamp, barcode, version. For each entry we re-parse
-        the barcode using current mappings to get size/speed/type/etc.
+        Mark what needs saving and flush it SAVE_DELAY_MS later, so a
+        burst of scans costs one write per file instead of one per scan.
         """
+        if store:
+            self._store_dirty = True
+        if rewrite_results:
+            # the rewrite covers any scans still waiting to be appended
+            self._results_dirty = True
+            self._pending_results.clear()
+        elif new_result is not None and not self._results_dirty:
+            self._pending_results.append(new_result)
+        if self._flush_after_id is None:
+            self._flush_after_id = self.master.after(SAVE_DELAY_MS, self._flush_saves)
+
+    def _flush_saves(self):
+        self._flush_after_id = None
+        if self._store_dirty:
+            self._store_dirty = False
+            self.store.save()
+        if self._results_dirty:
+            self._results_dirty = False
+            self._save_results_file()
+        elif self._pending_results:
+            pending, self._pending_results = self._pending_results, []
+            self._append_result_lines(pending)
+
+    def _flush_saves_and_wait(self):
+        """Write pending saves now and wait until they're on disk (closing / exiting)."""
+        if self._flush_after_id is not None:
+            try:
+                self.master.after_cancel(self._flush_after_id)
+            except Exception:
+                pass
+        self._flush_saves()
+        # the writer thread is a daemon: wait for it, or the writes die with the process
+        flush_writes()
+
+    def _iter_saved_results(self):
+        """
+        Yield raw entries from scan_results.jsonl, or from the legacy
+        scan_results.json array (streamed when ijson is available).
+        """
+        if RESULTS_JSONL.exists():
+            with RESULTS_JSONL.open("rb") as f:
+                for line in f:
+                    try:
+                        yield _json_loads(line)
+                    except ValueError:
+                        # blank or torn line (e.g. crash mid-write)
+                        continue
+            return
         if not RESULTS_JSON.exists():
-            return []
+            return
+        with RESULTS_JSON.open("rb") as f:
+            if ijson is not None:
+                yield from ijson.items(f, "item")
+                return
+            raw = json.load(f)
+        if isinstance(raw, list):
+            yield from raw
+
+    def _load_results_file(self) -> List[ScanResult]:
+        """
+        Load scan history, which only has id, timestamp, barcode,
+        version per entry. For each entry we re-parse the barcode
+        using current mappings to get size/speed/type/etc.
+        """
+        out: List[ScanResult] = []
         try:
-            raw = json.loads(RESULTS_JSON.read_text(encoding="utf-8"))
+            for obj in self._iter_saved_results():
+                sr = self._scan_result_from_entry(obj, len(out) + 1)
+                if sr is not None:
+                    out.append(sr)
         except Exception:
-            return []
+            # truncated/corrupt file: keep whatever was read before the error
+            pass
 
-        out: List[ScanResult] = []
-        if not isinstance(raw, list):
-            return out
+        return out
 
-        for obj in raw:
-            try:
-                barcode = str(obj.get("barcode", "")).strip()
-                if not barcode:
-                    continue
-
-                rid = int(obj.get("id", len(out) + 1))
-                ts = str(obj.get("timestamp") or datetime.now(timezone.utc).isoformat(timespec="seconds"))
-                version = int(obj.get("version", 0))
-
-                size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok = parse_barcode(
-                    barcode, self.store
-                )
-
-                # Use safe defaults if parsing fails (so GUI still works)
-                size_safe = size_gb or 0
-                speed_safe = speed_mts or 0
-                type_safe = mem_type or ""
-                mfr_safe = manufacturer or ""
-
-                out.append(
-                    ScanResult(
-                        id=rid,
-                        timestamp=ts,
-                        barcode=barcode,
-                        size_gb=size_safe,
-                        speed_mts=speed_safe,
-                        mem_type=type_safe,
-                        module_class=module_class,
-                        ecc=ecc,
-                        manufacturer=mfr_safe,
-                        version=version,
-                    )
-                )
-            except Exception:
-                continue
+    def _scan_result_from_entry(self, obj, default_id: int) -> Optional[ScanResult]:
+        try:
+            barcode = str(obj.get("barcode", "")).strip()
+            if not barcode:
+                return None
 
-        return out
+            rid = int(obj.get("id", default_id))
+            ts = str(obj.get("timestamp") or datetime.now(timezone.utc).isoformat(timespec="seconds"))
+            version = int(obj.get("version", 0))
+
+            size_gb, speed_mts, mem_type, manufacturer, module_class, ecc, parsed_ok = parse_barcode(
+                barcode, self.store
+            )
+
+            # Use safe defaults if parsing fails (so GUI still works)
+            size_safe = size_gb or 0
+            speed_safe = speed_mts or 0
+            type_safe = mem_type or ""
+            mfr_safe = manufacturer or ""
+
+            return ScanResult(
+                id=rid,
+                timestamp=ts,
+                barcode=barcode,
+                size_gb=size_safe,
+                speed_mts=speed_safe,
+                mem_type=type_safe,
+                module_class=module_class,
+                ecc=ecc,
+                manufacturer=mfr_safe,
+                version=version,
+            )
+        except Exception:
+            return None
 
     def _load_results_from_file_and_rebuild(self):
-        self.results_data = self._load_results_file()
-        self.result_seq = max((r.id for r in self.results_data), default=0)
+        self.results_data = {r.id: r for r in self._load_results_file()}
+        # ids only grow, so the last one is the highest
+        self.result_seq = next(reversed(self.results_data), 0)
+        migrate = not RESULTS_JSONL.exists() and bool(self.results_data)
+        if RESULTS_JSONL.exists() and not self._results_log_ends_with_newline():
+            # finish a line torn by a crash so it doesn't swallow the next one
+            queue_write(RESULTS_JSONL, b"\n", append=True)
         self._rebuild_everything_from_results()
+        if migrate:
+            # migrate a legacy scan_results.json history, after the rebuild
+            # has stamped each result with its permanent version
+            self._save_results_file()
 
     def _rebuild_everything_from_results(self):
         """
         Rebuild counts + meta from scan results, but KEEP permanent
         barcode_versions mapping. New barcodes get new versions.
+        Used on load; single removals go through _remove_result instead.
         """
-        self.variant_counts.clear()
-        self.variant_meta.clear()
-
-        next_ver = (max(self.barcode_versions.values()) if self.barcode_versions else 0) + 1
-        for r in self.results_data:
-            b = r.barcode
-            if b not in self.barcode_versions:
-                self.barcode_versions[b] = next_ver
-                next_ver += 1
-            r.version = self.barcode_versions[b]
-
-            self.variant_counts[b] = self.variant_counts.get(b, 0) + 1
-            self.variant_meta[b] = (
-                r.size_gb,
-                r.speed_mts,
-                r.mem_type,
-                r.module_class,
-                r.ecc,
-                r.manufacturer,
-            )
+        self._recompute_versions()
+
+        # counts/meta in bulk; the counts tree is only touched once, below
+        results = self.results_data.values()
+        self.variant_counts = Counter(r.barcode for r in results)
+        # last scan of each barcode wins
+        self.variant_meta = {r.barcode: r for r in results}
+
+        # Results cards (none exist yet: this only runs on load)
+        visible_results = (
+            self._newest_results(MAX_VISIBLE_RESULTS)
+            if MAX_VISIBLE_RESULTS and MAX_VISIBLE_RESULTS > 0
+            else list(self.results_data.values())
+        )
+        self._build_initial_cards(visible_results)
+
+        self._show_newest_as_latest()
+        self.refresh_counts_view()
 
+    def _recompute_versions(self):
+        """
+        Stamp each result with its barcode's permanent version, assigning
+        new versions to barcodes that don't have one yet.
+        """
+        versions_get = self.barcode_versions.get
+        for r in self.results_data.values():
+            ver = versions_get(r.barcode)
+            r.version = ver if ver is not None else self._ensure_version(r.barcode)
+
+    def _ensure_version(self, barcode: str) -> int:
+        """Permanent version of barcode, handing out the next one (and saving it) if it has none."""
+        ver = self.barcode_versions.get(barcode)
+        if ver is not None:
+            return ver
+        self._max_version += 1
+        ver = self.barcode_versions[barcode] = self._max_version
         # persist versions alongside mappings
-        self.store.versions = dict(self.barcode_versions)
-        self.store.save()
+        self._schedule_save(store=True)
+        return ver
+
+    def _apply_delta(self, r: ScanResult, sign: int):
+        """Add (+1) or take back (-1) one scan's share of variant_counts/variant_meta."""
+        b = r.barcode
+        count = self.variant_counts[b] + sign
+        if count <= 0:
+            self.variant_counts.pop(b, None)
+            self.variant_meta.pop(b, None)
+            return
+        self.variant_counts[b] = count
+        if sign < 0:
+            if self.variant_meta.get(b) is not r:
+                return
+            # meta follows the newest remaining scan of this barcode
+            r = next(x for x in reversed(self.results_data.values()) if x.barcode == b)
+        self.variant_meta[b] = r
 
-        # Rebuild results cards
-        for it in getattr(self, "results_items", []):
-            try:
-                it["frame"].destroy()
-            except Exception:
-                pass
-        self.results_items = []
+    def _newest_results(self, n: int) -> List[ScanResult]:
+        """Last n results, oldest first."""
+        newest = list(islice(reversed(self.results_data.values()), n))
+        newest.reverse()
+        return newest
 
+    def _show_newest_as_latest(self):
         if self.results_data:
-            visible_results = (
-                self.results_data[-MAX_VISIBLE_RESULTS:]
-                if MAX_VISIBLE_RESULTS and MAX_VISIBLE_RESULTS > 0
-                else self.results_data
-            )
-            for r in visible_results:
-                self._render_card_from_result(r, add_to_top=True)
-
-            newest = self.results_data[-1]
+            newest = next(reversed(self.results_data.values()))
             self.latest_item_id = newest.id
             self.latest_key = newest.barcode
             self.update_latest_panel(
@@ -922,9 +1296,12 @@ class App(ttk.Frame):
             self.latest_key = None
             self.update_latest_panel(0, 0, 0, "", None, None, "", "")
 
-        self.refresh_counts_view()
-
     # --------- Small helpers ----------
+    def _on_close(self):
+        # let pending/queued saves reach the disk before the window goes away
+        self._flush_saves_and_wait()
+        self.master.destroy()
+
     def _enter_advance(self, var: tk.StringVar, next_widget):
         if var.get().strip():
             try:
@@ -957,15 +1334,13 @@ class App(ttk.Frame):
         except Exception:
             pass
 
-    def _attach_copy(self, widget: tk.Widget, text_getter):
-        def handler(event, tg=text_getter):
-            txt = tg()
-            if txt is None:
-                return
-            self._copy_text(str(txt), event)
+    def _copy_widget_text(self, event):
+        self._copy_text(str(event.widget.cget("text")), event)
 
-        widget.bind("<Button-3>", handler)
-        widget.bind("<Button-2>", handler)
+    def _attach_copy(self, widget: tk.Widget):
+        """Right-click on widget copies its text (one shared handler, no per-widget closures)."""
+        widget.bind("<Button-3>", self._copy_widget_text)
+        widget.bind("<Button-2>", self._copy_widget_text)
 
     # --------- Counts UI ----------
     def on_counts_right_click(self, event):
@@ -990,16 +1365,6 @@ class App(ttk.Frame):
             self.counts_sort_reverse = False
         self.refresh_counts_view()
 
-    def _counts_sort_key(self, row: Dict) -> object:
-        col = self.counts_sort_column
-        val = row.get(col)
-        if col in ("size", "speed", "version", "count"):
-            try:
-                return int(val) if val is not None else -1
-            except Exception:
-                return -1
-        return str(val).lower() if val is not None else ""
-
     # --------- Export ----------
     def export_versions(self):
         if not self.barcode_versions:
@@ -1014,78 +1379,51 @@ class App(ttk.Frame):
         if not filename:
             return
 
-        rows = []
-        for barcode, version in self.barcode_versions.items():
-            meta = self.variant_meta.get(barcode)
-            if meta is None:
-                found = next((r for r in self.results_data if r.barcode == barcode), None)
-                if found:
-                    meta = (
-                        found.size_gb,
-                        found.speed_mts,
-                        found.mem_type,
-                        found.module_class,
-                        found.ecc,
-                        found.manufacturer,
-                    )
-                else:
-                    meta = (None, None, None, None, None, None)
-
-            size_gb, speed, mem_type, module_class, ecc, mfr = meta
-            count = self.variant_counts.get(barcode, 0)
-
-            spec_parts = []
-            if size_gb is not None:
-                spec_parts.append(f"{size_gb} GB")
-            if speed is not None:
-                spec_parts.append(f"{speed} MT/s")
-            if mem_type:
-                spec_parts.append(str(mem_type))
-            spec = " ".join(spec_parts)
-
-            ecc_str = "Yes" if ecc else ("No" if ecc is not None else "?")
-
-            rows.append(
-                {
-                    "VersionNum": version,
-                    "Version": f"v{version}",
-                    "Spec": spec,
-                    "Class": module_class or "",
-                    "ECC": ecc_str,
-                    "Manufacturer": mfr or "",
-                    "Count": count,
-                    "Barcode": barcode,
-                }
-            )
-
-        rows.sort(key=lambda r: r["VersionNum"])
-
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Variants"
+            from openpyxl import Workbook  # type: ignore
+
+            # write-only: rows are streamed out instead of kept as Cell objects
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Variants")
 
             headers = ["Version", "Spec", "Class", "ECC", "Manufacturer", "Count", "Barcode"]
             ws.append(headers)
 
-            for r in rows:
-                ws.append(
-                    [
-                        r["Version"],
-                        r["Spec"],
-                        r["Class"],
-                        r["ECC"],
-                        r["Manufacturer"],
-                        r["Count"],
-                        r["Barcode"],
-                    ]
-                )
+            for row in (
+                self._build_export_row(b, v) for b, v in sorted(self.barcode_versions.items(), key=itemgetter(1))
+            ):
+                ws.append(row)
 
             wb.save(filename)
             messagebox.showinfo(APP_TITLE, f"Versions exported to:\n{filename}")
         except Exception as e:
             messagebox.showerror(APP_TITLE, f"Failed to export versions:\n{e}")
 
+    def _build_export_row(self, barcode: str, version: int) -> Tuple:
+        """One export row, in the order of export_versions' headers."""
+        meta = self.variant_meta.get(barcode)
+        if meta is None:
+            # versioned, but no scans left
+            return (version_text(version), "", "", YES_NO[None], "", 0, barcode)
+
+        spec_parts = []
+        if meta.size_gb is not None:
+            spec_parts.append(f"{meta.size_gb} GB")
+        if meta.speed_mts is not None:
+            spec_parts.append(f"{meta.speed_mts} MT/s")
+        if meta.mem_type:
+            spec_parts.append(str(meta.mem_type))
+
+        return (
+            version_text(version),
+            " ".join(spec_parts),
+            meta.module_class or "",
+            YES_NO[meta.ecc],
+            meta.manufacturer or "",
+            self.variant_counts.get(barcode, 0),
+            barcode,
+        )
+
     # --------- Scan handling ----------
     def _clean_scanned_code(self, raw: str) -> str:
         """
@@ -1105,8 +1443,9 @@ class App(ttk.Frame):
 
         tokens = s.split()
 
-        # Drop country code prefix, e.g. "CN", "KR"
-        if len(tokens) >= 2 and re.fullmatch(r"[A-Z]{2}", tokens[0]):
+        # Drop country code prefix, e.g. "CN", "KR" (two ASCII capitals)
+        t0 = tokens[0]
+        if len(tokens) >= 2 and len(t0) == 2 and t0.isascii() and t0.isalpha() and t0.isupper():
             tokens = tokens[1:]
 
         if len(tokens) >= 2 and tokens[-1].isdigit() and tokens[-2].isdigit():
@@ -1166,27 +1505,14 @@ class App(ttk.Frame):
 
     def focus_mapping_field(self, var: Optional[tk.StringVar]):
         self.master.lift()
-        for w in self.master.winfo_children():
-            if self._focus_entry_recursive(w, var):
-                return
-
-    def _focus_entry_recursive(self, widget, target_var):
+        widget = self._entry_by_var.get(str(var)) if var is not None else None
+        if widget is None:
+            return
+        widget.focus_set()
         try:
-            if isinstance(widget, (ttk.Entry, ttk.Combobox)):
-                tv = widget.cget("textvariable")
-                if tv and target_var and str(target_var) == str(tv):
-                    widget.focus_set()
-                    try:
-                        widget.icursor(tk.END)
-                    except Exception:
-                        pass
-                    return True
+            widget.icursor(tk.END)
         except Exception:
             pass
-        for child in widget.winfo_children():
-            if self._focus_entry_recursive(child, target_var):
-                return True
-        return False
 
     # --------- Save mapping ----------
     def on_save_mapping(self):
@@ -1196,17 +1522,34 @@ class App(ttk.Frame):
 
         barcode_key = self._clean_scanned_code(raw_code)
 
-        def as_int(s):
+        # each .get() is a Tcl round-trip: read every field once
+        size_raw, class_raw, mfr_raw, ecc_sel, ddr_raw, speed_raw, kind_raw, as_regex = (
+            self.map_size_var.get(),
+            self.map_class_var.get(),
+            self.map_mfr_var.get(),
+            self.map_ecc_var.get(),
+            self.map_ddr_var.get(),
+            self.map_speed_var.get(),
+            self.map_kind_var.get(),
+            self.map_regex_var.get(),
+        )
+
+        def as_int(s: str) -> Optional[int]:
+            s = s.strip()
+            if not s:
+                # blank field, the usual case: no exception needed
+                return None
+            if s.isdigit() and s.isascii():
+                return int(s)
             try:
                 return int(s)
-            except Exception:
+            except ValueError:
                 return None
 
-        size_gb = as_int(self.map_size_var.get())
-        module_class = self.map_class_var.get().strip().upper() or None
-        manufacturer = self.map_mfr_var.get().strip().title() or None
+        size_gb = as_int(size_raw)
+        module_class = class_raw.strip().upper() or None
+        manufacturer = mfr_raw.strip().title() or None
 
-        ecc_sel = self.map_ecc_var.get()
         if ecc_sel == "Yes":
             ecc: Optional[bool] = True
         elif ecc_sel == "No":
@@ -1214,9 +1557,9 @@ class App(ttk.Frame):
         else:
             ecc = None
 
-        manual_ddr = self.map_ddr_var.get().strip().upper()
-        manual_speed = as_int(self.map_speed_var.get())
-        manual_kind = self.map_kind_var.get().strip()
+        manual_ddr = ddr_raw.strip().upper()
+        manual_speed = as_int(speed_raw)
+        manual_kind = kind_raw.strip()
 
         mem_type: Optional[str] = None
         speed_mts: Optional[int] = None
@@ -1261,17 +1604,13 @@ class App(ttk.Frame):
             manufacturer=manufacturer,
             module_class=module_class,
             ecc=ecc,
-            regex=self.map_regex_var.get(),
+            regex=as_regex,
         )
         self.store.add(m)
         self.refresh_saved_mappings_list()
 
         # Ensure this exact barcode has a permanent version
-        if barcode_key not in self.barcode_versions:
-            next_ver = (max(self.barcode_versions.values()) if self.barcode_versions else 0) + 1
-            self.barcode_versions[barcode_key] = next_ver
-            self.store.versions = dict(self.barcode_versions)
-            self.store.save()
+        self._ensure_version(barcode_key)
 
         # Immediately try scanning with the new mapping
         size_gb2, speed_mts2, mem_type2, manufacturer2, module_class2, ecc2, parsed_ok = parse_barcode(
@@ -1303,16 +1642,7 @@ class App(ttk.Frame):
         rid = self._next_result_id()
         ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
-        if barcode_key in self.barcode_versions:
-            version = self.barcode_versions[barcode_key]
-        else:
-            version = (max(self.barcode_versions.values()) if self.barcode_versions else 0) + 1
-            self.barcode_versions[barcode_key] = version
-            self.store.versions = dict(self.barcode_versions)
-            self.store.save()
-
-        self.variant_counts[barcode_key] = self.variant_counts.get(barcode_key, 0) + 1
-        self.variant_meta[barcode_key] = (size_gb, speed_mts, mem_type, module_class, ecc, manufacturer)
+        version = self._ensure_version(barcode_key)
 
         sr = ScanResult(
             id=rid,
@@ -1326,16 +1656,14 @@ class App(ttk.Frame):
             manufacturer=manufacturer,
             version=version,
         )
-        self.results_data.append(sr)
+        self.results_data[rid] = sr
+        self._apply_delta(sr, +1)
 
-        self._render_card_from_result(sr, add_to_top=True)
-
-        if MAX_VISIBLE_RESULTS and len(self.results_items) > MAX_VISIBLE_RESULTS:
-            oldest = self.results_items.pop()
-            try:
-                oldest["frame"].destroy()
-            except Exception:
-                pass
+        recycled = None
+        if MAX_VISIBLE_RESULTS > 0 and len(self.results_items) >= MAX_VISIBLE_RESULTS:
+            # full: the oldest card is refilled and moved to the top
+            recycled = self.results_items.pop()
+        self._render_card_from_result(sr, add_to_top=True, item=recycled)
 
         self.latest_item_id = sr.id
         self.latest_key = sr.barcode
@@ -1351,21 +1679,54 @@ class App(ttk.Frame):
         )
 
         self.refresh_counts_view()
-        self._save_results_file()
+        self._schedule_save(new_result=sr)
+
+    def _render_card_from_result(self, r: ScanResult, add_to_top: bool, item: Optional[Dict] = None):
+        """Show r in a new card, or in `item` (a card no longer in results_items) if given."""
+        if item is None:
+            item = self._build_card(r)
+        else:
+            self._fill_card(item, r)
+            item["frame"].pack_forget()
+        card = item["frame"]
+        if add_to_top and self.results_items:
+            card.pack(fill=tk.X, expand=True, pady=4, before=self.results_items[0]["frame"])
+            self.results_items.appendleft(item)
+        else:
+            card.pack(fill=tk.X, expand=True, pady=4)
+            self.results_items.append(item)
 
-    def _render_card_from_result(self, r: ScanResult, add_to_top: bool):
+        self._scroll_results_to_top()
+
+    def _scroll_results_to_top(self):
+        try:
+            self.results_canvas.update_idletasks()
+            self.results_canvas.yview_moveto(0)
+        except Exception:
+            pass
+
+    def _build_initial_cards(self, visible: List[ScanResult]):
+        """Create the cards for `visible` (oldest first, so the newest ends up on top) at load."""
+        for r in reversed(visible):
+            item = self._build_card(r)
+            item["frame"].pack(fill=tk.X, expand=True, pady=4)
+            self.results_items.append(item)
+        self._scroll_results_to_top()
+
+    def _build_card(self, r: ScanResult) -> Dict:
+        """Create (but don't pack) the card widgets for one result."""
         card = ttk.Frame(self.results_inner, padding=8, relief=tk.RIDGE)
         card.grid_columnconfigure(1, weight=1)
 
-        size_lbl = ttk.Label(card, text=f"{r.size_gb} GB", foreground=COLOR_SIZE)
-        speed_lbl = ttk.Label(card, text=f"{r.speed_mts} MT/s", foreground=COLOR_SPEED)
-        type_lbl = ttk.Label(card, text=f"{r.mem_type.upper()}", foreground=COLOR_TYPE)
-        class_lbl = ttk.Label(card, text=f"{r.module_class or ''}", foreground=COLOR_CLASS)
-        ecc_str = "Yes" if r.ecc else ("No" if r.ecc is not None else "?")
-        ecc_lbl = ttk.Label(card, text=ecc_str, foreground=COLOR_ECC)
-        mfr_lbl = ttk.Label(card, text=f"{r.manufacturer}", foreground=COLOR_MFR)
-        ver_lbl = ttk.Label(card, text=f"v{r.version}", foreground=COLOR_VERSION)
-        code_lbl = ttk.Label(card, text=r.barcode, foreground=COLOR_BARCODE)
+        size_t, speed_t, type_t, class_t, ecc_t, mfr_t, ver_t, code_t = self._card_texts(r)
+        size_lbl = ttk.Label(card, text=size_t, foreground=COLOR_SIZE)
+        speed_lbl = ttk.Label(card, text=speed_t, foreground=COLOR_SPEED)
+        type_lbl = ttk.Label(card, text=type_t, foreground=COLOR_TYPE)
+        class_lbl = ttk.Label(card, text=class_t, foreground=COLOR_CLASS)
+        ecc_lbl = ttk.Label(card, text=ecc_t, foreground=COLOR_ECC)
+        mfr_lbl = ttk.Label(card, text=mfr_t, foreground=COLOR_MFR)
+        ver_lbl = ttk.Label(card, text=ver_t, foreground=COLOR_VERSION)
+        code_lbl = ttk.Label(card, text=code_t, foreground=COLOR_BARCODE)
 
         ttk.Label(card, text="Size:").grid(row=0, column=0, sticky="w")
         size_lbl.grid(row=0, column=1, sticky="w")
@@ -1387,27 +1748,51 @@ class App(ttk.Frame):
         code_lbl.grid(row=2, column=1, columnspan=7, sticky="w")
 
         for w in (size_lbl, speed_lbl, type_lbl, class_lbl, ecc_lbl, mfr_lbl, ver_lbl, code_lbl):
-            self._attach_copy(w, lambda w=w: w.cget("text"))
-
-        rm_btn = ttk.Button(
-            card,
-            text="Remove",
-            command=lambda i=r.id, k=r.barcode, f=card: self.remove_result(i, k, f),
-        )
+            self._attach_copy(w)
+
+        item = {
+            "id": r.id,
+            "frame": card,
+            "key": r.barcode,
+            "labels": {
+                "size": size_lbl,
+                "speed": speed_lbl,
+                "type": type_lbl,
+                "class": class_lbl,
+                "ecc": ecc_lbl,
+                "mfr": mfr_lbl,
+                "ver": ver_lbl,
+                "code": code_lbl,
+            },
+        }
+        # reads the id off the item, so it stays right when the card is reused
+        rm_btn = ttk.Button(card, text="Remove", command=partial(self._remove_card, item))
         rm_btn.grid(row=0, column=6, rowspan=3, sticky="e")
+        return item
+
+    @staticmethod
+    def _card_texts(r: ScanResult) -> Tuple[str, ...]:
+        """Card label texts, in the order of the card's "labels" dict."""
+        return (
+            f"{r.size_gb} GB",
+            f"{r.speed_mts} MT/s",
+            r.mem_type.upper(),
+            r.module_class or "",
+            YES_NO[r.ecc],
+            f"{r.manufacturer}",
+            version_text(r.version),
+            r.barcode,
+        )
 
-        if add_to_top and self.results_items:
-            card.pack(fill=tk.X, expand=True, pady=4, before=self.results_items[0]["frame"])
-            self.results_items.insert(0, {"id": r.id, "frame": card, "key": r.barcode})
-        else:
-            card.pack(fill=tk.X, expand=True, pady=4)
-            self.results_items.append({"id": r.id, "frame": card, "key": r.barcode})
+    def _fill_card(self, item: Dict, r: ScanResult):
+        """Point an existing card at another result (reconfigure only, no new widgets)."""
+        item["id"] = r.id
+        item["key"] = r.barcode
+        for lbl, text in zip(item["labels"].values(), self._card_texts(r)):
+            lbl.configure(text=text)
 
-        try:
-            self.results_canvas.update_idletasks()
-            self.results_canvas.yview_moveto(0)
-        except Exception:
-            pass
+    def _remove_card(self, item: Dict):
+        self._remove_result(item["id"])
 
     def update_latest_panel(
         self,
@@ -1420,75 +1805,133 @@ class App(ttk.Frame):
         manufacturer: str,
         barcode: str,
     ):
-        self.latest_ver_lbl.configure(text=f"v{version}" if version else "v–")
-        self.latest_size_val.configure(text=f"{size_gb} GB" if size_gb else "– GB")
-        self.latest_speed_val.configure(text=f"{speed_mts} MT/s" if speed_mts else "– MT/s")
-        self.latest_type_val.configure(text=f"{mem_type.upper()}" if mem_type else "–")
-        self.latest_class_val.configure(text=module_class or "–")
-        ecc_str = "Yes" if ecc else ("No" if ecc is not None else "–")
-        self.latest_ecc_val.configure(text=ecc_str)
-        self.latest_mfr_val.configure(text=manufacturer if manufacturer else "–")
-        self.latest_code_val.configure(text=barcode if barcode else "–")
+        texts = (
+            version_text(version) if version else "v–",
+            f"{size_gb} GB" if size_gb else "– GB",
+            f"{speed_mts} MT/s" if speed_mts else "– MT/s",
+            f"{mem_type.upper()}" if mem_type else "–",
+            module_class or "–",
+            YES_NO_DASH[ecc],
+            manufacturer if manufacturer else "–",
+            barcode if barcode else "–",
+        )
+        old = self._latest_cache
+        if texts == old:
+            return
+        labels = (
+            self.latest_ver_lbl,
+            self.latest_size_val,
+            self.latest_speed_val,
+            self.latest_type_val,
+            self.latest_class_val,
+            self.latest_ecc_val,
+            self.latest_mfr_val,
+            self.latest_code_val,
+        )
+        # only labels whose text changed cost a Tcl call (rescans change few or none)
+        for i, (lbl, text) in enumerate(zip(labels, texts)):
+            if not old or old[i] != text:
+                lbl.configure(text=text)
+        self._latest_cache = texts
 
     def remove_latest_scan(self):
         if self.latest_item_id is None:
             return
-        self.results_data = [r for r in self.results_data if r.id != self.latest_item_id]
-        self._rebuild_everything_from_results()
-        self._save_results_file()
+        self._remove_result(self.latest_item_id)
 
-    def remove_result(self, item_id: int, key: str, frame: ttk.Frame):
-        self.results_data = [r for r in self.results_data if r.id != item_id]
-        self._rebuild_everything_from_results()
-        self._save_results_file()
+    def _remove_result(self, item_id: int):
+        """
+        Remove one scan and patch only what it touched: its count/meta,
+        its card (pulling the next older scan into view) and, if it was
+        the newest, the latest panel. Versions are permanent, so the
+        store doesn't need saving.
+        """
+        sr = self.results_data.pop(item_id, None)
+        if sr is None:
+            return
+        self._apply_delta(sr, -1)
+
+        for idx, it in enumerate(self.results_items):
+            if it["id"] == item_id:
+                del self.results_items[idx]
+                if 0 < MAX_VISIBLE_RESULTS <= len(self.results_data):
+                    # reuse the card for the next older scan, now at the bottom
+                    self._render_card_from_result(
+                        self._newest_results(MAX_VISIBLE_RESULTS)[0], add_to_top=False, item=it
+                    )
+                else:
+                    try:
+                        it["frame"].destroy()
+                    except Exception:
+                        pass
+                break
 
-    def refresh_counts_view(self):
-        self.counts_tree.delete(*self.counts_tree.get_children())
+        if item_id == self.latest_item_id:
+            self._show_newest_as_latest()
+        self.refresh_counts_view()
+        self._schedule_save(rewrite_results=True)
 
-        rows: List[Dict] = []
+    def refresh_counts_view(self):
+        """
+        Sync the counts table with variant_counts. Rows are keyed by
+        barcode (the item id), so only new, changed or vanished rows
+        cost a Tcl call, plus one reorder when the order changed.
+        """
+        col_idx = COUNTS_COLUMNS.index(self.counts_sort_column)
+        numeric = self.counts_sort_column in _NUMERIC_COUNTS_COLUMNS
+
+        # (sort key, barcode, row values): the key is computed once per row
+        decorated: List[Tuple[object, str, Tuple]] = []
+        add_row = decorated.append
+        ver_get = self.barcode_versions.get
+        metas = self.variant_meta
         for key, count in self.variant_counts.items():
-            ver = self.barcode_versions.get(key, 0)
-            meta = self.variant_meta.get(key, (None, None, None, None, None, None))
-            size_val = meta[0]
-            speed_val = meta[1]
-            module_class = meta[3]
-            ecc = meta[4]
-            mfr = meta[5] if meta[5] is not None else "?"
-            ecc_str = "Yes" if ecc else ("No" if ecc is not None else "?")
-            rows.append(
-                {
-                    "variant": key,
-                    "size": size_val,
-                    "speed": speed_val,
-                    "class": module_class or "",
-                    "ecc": ecc_str,
-                    "manufacturer": mfr,
-                    "version": ver,
-                    "count": count,
-                }
-            )
-
-        rows.sort(key=self._counts_sort_key, reverse=self.counts_sort_reverse)
-
-        for row in rows:
-            size_disp = row["size"] if row["size"] is not None else "?"
-            speed_disp = row["speed"] if row["speed"] is not None else "?"
-            ver_disp = f"v{row['version']}" if row["version"] else "?"
-            count_disp = row["count"]
-            self.counts_tree.insert(
-                "",
-                tk.END,
-                values=(
-                    row["variant"],
-                    size_disp,
-                    speed_disp,
-                    row["class"],
-                    row["ecc"],
-                    row["manufacturer"],
-                    ver_disp,
-                    count_disp,
-                ),
+            ver = ver_get(key, 0)
+            meta = metas[key]
+            size_val = meta.size_gb
+            speed_val = meta.speed_mts
+            mfr = meta.manufacturer if meta.manufacturer is not None else "?"
+            ecc_str = YES_NO[meta.ecc]
+            raw = (key, size_val, speed_val, meta.module_class or "", ecc_str, mfr, ver, count)
+            val = raw[col_idx]
+            if numeric:
+                sort_key = val if val is not None else -1
+            else:
+                sort_key = str(val).lower()
+            values = (
+                key,
+                size_val if size_val is not None else "?",
+                speed_val if speed_val is not None else "?",
+                raw[3],
+                ecc_str,
+                mfr,
+                version_text(ver) if ver else "?",
+                count,
             )
+            add_row((sort_key, key, values))
+
+        decorated.sort(key=itemgetter(0), reverse=self.counts_sort_reverse)
+
+        tree = self.counts_tree
+        insert, item = tree.insert, tree.item
+        shown_get = self._counts_shown.get
+        now_shown: Dict[str, Tuple] = {}
+        for _, key, values in decorated:
+            old = shown_get(key)
+            if old is None:
+                insert("", tk.END, iid=key, values=values)
+            elif old != values:
+                item(key, values=values)
+            now_shown[key] = values
+
+        gone = [key for key in self._counts_shown if key not in now_shown]
+        if gone:
+            tree.delete(*gone)
+        self._counts_shown = now_shown
+
+        order = tuple(now_shown)
+        if order != tree.get_children():
+            tree.set_children("", *order)
 
     def clear_results_and_counts(self):
         if messagebox.askyesno(
@@ -1499,7 +1942,7 @@ class App(ttk.Frame):
             self.results_data.clear()
             self.variant_counts.clear()
             self.variant_meta.clear()
-            self._save_results_file()
+            self._schedule_save(rewrite_results=True)
 
             # Clear UI cards
             for it in self.results_items:
@@ -1507,7 +1950,7 @@ class App(ttk.Frame):
                     it["frame"].destroy()
                 except Exception:
                     pass
-            self.results_items = []
+            self.results_items.clear()
 
             # Clear counts + latest panel
             self.refresh_counts_view()
@@ -1537,8 +1980,8 @@ class App(ttk.Frame):
 
     def refresh_saved_mappings_list(self):
         self.saved_list.delete(0, tk.END)
-        for desc in self.store.all_descriptions():
-            self.saved_list.insert(tk.END, desc)
+        # one Tcl call for the whole list
+        self.saved_list.insert(tk.END, *self.store.all_descriptions())
 
 
 # -------------------- Main --------------------